@@ -1,8 +1,29 @@
-from setuptools import setup, find_packages
+from setuptools import Extension, setup, find_packages
+
+try:
+    # The compiled kernels are optional; pure-numpy and Numba fallbacks
+    # cover every code path when Cython (or a compiler) is unavailable.
+    import numpy
+    from Cython.Build import cythonize
+
+    ext_modules = cythonize(
+        [
+            Extension(
+                "_mapkernels",
+                ["src/_mapkernels.pyx"],
+                include_dirs=[numpy.get_include()],
+                extra_compile_args=["-O3", "-march=native", "-fopenmp"],
+                extra_link_args=["-fopenmp"],
+            )
+        ]
+    )
+except ImportError:
+    ext_modules = []
 
 setup(
     name="mappability-diff",
     version="0.1",
     packages=find_packages(where="src"),
     package_dir={"": "src"},
-)
\ No newline at end of file
+    ext_modules=ext_modules,
+)
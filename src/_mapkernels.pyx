@@ -0,0 +1,47 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True, language_level=3
+"""
+Compiled kernels for the hot mappability counting paths.
+
+Built at install time when Cython is available (see setup.py); callers
+fall back to the Numba or pure-numpy paths when the extension is absent.
+"""
+
+import numpy as np
+
+cimport numpy as cnp
+from cython.parallel cimport prange
+
+ctypedef fused track_t:
+    cnp.float32_t
+    cnp.uint8_t
+
+
+def count_above_ranges(const track_t[::1] arr, const cnp.int64_t[::1] starts,
+                       const cnp.int64_t[::1] ends, double threshold):
+    """
+    Count elements above threshold in each [start, end) range of arr.
+
+    Fuses the compare and sum per range without allocating any
+    chromosome-length temporary, parallelized over ranges with OpenMP.
+
+    Args:
+        arr: float32 or uint8 mappability scores for one chromosome.
+        starts: int64 0-based inclusive range starts.
+        ends: int64 exclusive range ends, each within len(arr).
+        threshold: Cutoff in the units of arr's dtype.
+
+    Returns:
+        np.ndarray: int64 count of elements above threshold per range.
+    """
+    cdef Py_ssize_t n = starts.shape[0]
+    out = np.empty(n, dtype=np.int64)
+    cdef cnp.int64_t[::1] out_view = out
+    cdef Py_ssize_t i, j
+    cdef cnp.int64_t count
+    for i in prange(n, nogil=True, schedule='static'):
+        count = 0
+        for j in range(starts[i], ends[i]):
+            if arr[j] > threshold:
+                count = count + 1
+        out_view[i] = count
+    return out
@@ -10,78 +10,410 @@ different k-mer sizes, and visualize the results.
 
 import os
 import argparse
-from typing import Dict, List, Tuple
+import functools
+import hashlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 import pyBigWig
 import gffpandas.gffpandas as gffpd
 import pandas as pd
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; pure-numpy paths are used when absent
+    njit = None
 
-from visualise import plot_mappability_distribution, plot_mappability_changes, plot_gene_mappability_changes
+try:
+    from _mapkernels import count_above_ranges
+except ImportError:  # compiled kernels are built only when Cython is available
+    count_above_ranges = None
 
 
-def load_bigwig(file_path: str) -> Dict[str, np.ndarray]:
+from visualise import (
+    HIST_BINS,
+    plot_mappability_distribution,
+    plot_mappability_changes,
+    plot_gene_mappability_changes,
+)
+
+
+CHUNK_SIZE = 1 << 24  # bases fetched per bw.values() call when tiling a chromosome
+
+PAIR_BLOCK = 1 << 20  # bases per block when diffing all samples at once; keeps the stacked block cache-friendly
+
+MAPPABLE_THRESHOLD = 0.9  # score above which a base counts as mappable
+
+QUANTIZE_SCALE = 255  # uint8 levels used when quantizing [0, 1] scores
+QUANTIZED_THRESHOLD = int(MAPPABLE_THRESHOLD * QUANTIZE_SCALE)  # 0.9 in uint8 units
+
+
+def mappable_threshold(dtype: np.dtype) -> float:
+    """
+    Return the mappability cutoff in the units of the given array dtype.
+
+    Args:
+        dtype (np.dtype): Dtype of a mappability array (float32 or uint8).
+
+    Returns:
+        float: MAPPABLE_THRESHOLD for float tracks, its uint8 equivalent
+        for quantized tracks.
+    """
+    if np.issubdtype(dtype, np.integer):
+        return QUANTIZED_THRESHOLD
+    return MAPPABLE_THRESHOLD
+
+
+if njit is not None:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _count_mappable(arr, starts, ends, threshold, out):
+        """
+        Count bases above threshold in each [start, end) range of arr.
+
+        Fuses the compare and sum in one pass per exon, parallelized over
+        exons, so no chromosome-length boolean or prefix-sum temporary is
+        allocated.
+        """
+        for i in prange(len(starts)):
+            count = 0
+            for j in range(starts[i], ends[i]):
+                if arr[j] > threshold:
+                    count += 1
+            out[i] = count
+
+
+def _cache_key(file_path: str) -> str:
+    """
+    Build a cache key for a BigWig file from its path, mtime and size.
+
+    Args:
+        file_path (str): Path to the BigWig file.
+
+    Returns:
+        str: A hex digest that changes whenever the file changes.
+    """
+    stat = os.stat(file_path)
+    identity = f"{os.path.abspath(file_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+    return hashlib.sha1(identity.encode()).hexdigest()
+
+
+def _read_chrom(bw, chrom: str, size: int) -> np.ndarray:
+    """
+    Read one chromosome from an open BigWig handle as a float32 array.
+
+    Regions outside BigWig coverage come back as NaN, which would poison
+    every downstream subtract and threshold compare; they are zeroed here
+    in one vectorized pass so later ufuncs never hit the NaN slow path.
+
+    Args:
+        bw: An open pyBigWig handle.
+        chrom (str): Chromosome name.
+        size (int): Chromosome length in bases.
+
+    Returns:
+        np.ndarray: A float32 array of mappability scores, NaN-free.
+    """
+    arr = np.empty(size, dtype=np.float32)
+    for offset in range(0, size, CHUNK_SIZE):
+        stop = min(offset + CHUNK_SIZE, size)
+        arr[offset:stop] = bw.values(chrom, offset, stop, numpy=True)
+    np.nan_to_num(arr, copy=False, nan=0.0)
+    return arr
+
+
+def _quantize_chrom(arr: np.ndarray) -> np.ndarray:
+    """
+    Quantize a float32 score array in [0, 1] to uint8 (value * 255).
+
+    Expects NaN-free input (casting NaN to an integer dtype is undefined);
+    _read_chrom zeroes coverage gaps before this runs.
+
+    Args:
+        arr (np.ndarray): float32 mappability scores; modified in place.
+
+    Returns:
+        np.ndarray: uint8 array of quantized scores.
+    """
+    np.multiply(arr, QUANTIZE_SCALE, out=arr)
+    return arr.astype(np.uint8)
+
+
+def load_bigwig(
+    file_path: str, cache_dir: Optional[str] = None, quantize: bool = False
+) -> Dict[str, np.ndarray]:
     """
     Load a BigWig file and extract mappability data.
 
+    Chromosomes are read as float32 numpy arrays (numpy=True) rather than
+    Python lists, and large chromosomes are fetched in CHUNK_SIZE tiles into
+    a preallocated buffer to keep peak memory at one chromosome of float32.
+
+    When cache_dir is given, each chromosome is persisted as a .npy file the
+    first time the BigWig is read and memory-mapped (mmap_mode='r') on every
+    load, so repeated runs skip the BigWig decompression and the kernel pages
+    data in on demand instead of holding every sample resident.
+
+    With quantize=True, scores are stored as uint8 (value * 255) instead of
+    float32, quartering memory and doubling SIMD throughput on downstream
+    compares; the MAPPABLE_THRESHOLD cutoff becomes an integer compare (see
+    mappable_threshold).
+
     Args:
         file_path (str): Path to the BigWig file.
+        cache_dir (Optional[str]): Directory for the .npy cache. If None,
+            arrays are read directly into memory.
+        quantize (bool): Quantize scores to uint8 instead of float32.
 
     Returns:
         Dict[str, np.ndarray]: A dictionary where keys are chromosome names
-        and values are numpy arrays of mappability scores.
+        and values are numpy arrays of mappability scores (float32, or
+        uint8 when quantize is set).
     """
     bw = pyBigWig.open(file_path)
     chrom_sizes = dict(bw.chroms().items())
+    key = _cache_key(file_path) if cache_dir else None
+    suffix = ".u8" if quantize else ""
     data = {}
     for chrom, size in chrom_sizes.items():
-        data[chrom] = bw.values(chrom, 0, size)
+        if cache_dir:
+            cache_file = os.path.join(cache_dir, f"{key}_{chrom}{suffix}.npy")
+            if not os.path.exists(cache_file):
+                arr = _read_chrom(bw, chrom, size)
+                if quantize:
+                    arr = _quantize_chrom(arr)
+                np.save(cache_file, arr)
+            data[chrom] = np.load(cache_file, mmap_mode="r")
+        else:
+            arr = _read_chrom(bw, chrom, size)
+            data[chrom] = _quantize_chrom(arr) if quantize else arr
     bw.close()
     return data
 
 
+def flatten_chromosomes(
+    data: Dict[str, np.ndarray], chroms: Optional[List[str]] = None
+) -> Tuple[np.ndarray, Dict[str, Tuple[int, int]]]:
+    """
+    Concatenate per-chromosome arrays into one contiguous array.
+
+    Args:
+        data (Dict[str, np.ndarray]): Per-chromosome mappability arrays.
+        chroms (Optional[List[str]]): Chromosome order to use; defaults to
+            the dictionary's own order. Pass the same order for every sample
+            so flattened arrays are positionally comparable.
+
+    Returns:
+        Tuple[np.ndarray, Dict[str, Tuple[int, int]]]: The flattened array
+        and an index mapping each chromosome to its (start, end) offsets.
+    """
+    if chroms is None:
+        chroms = list(data.keys())
+    total = sum(len(data[c]) for c in chroms)
+    flat = np.empty(total, dtype=data[chroms[0]].dtype)
+    index = {}
+    pos = 0
+    for chrom in chroms:
+        arr = data[chrom]
+        flat[pos:pos + len(arr)] = arr
+        index[chrom] = (pos, pos + len(arr))
+        pos += len(arr)
+    return flat, index
+
+
 def compare_mappability(
-    data1: Dict[str, np.ndarray], data2: Dict[str, np.ndarray]
+    flat1: np.ndarray,
+    flat2: np.ndarray,
+    index: Dict[str, Tuple[int, int]],
+    out: Optional[np.ndarray] = None,
 ) -> Dict[str, np.ndarray]:
     """
-    Compare mappability data between two different k-mer sizes.
+    Compare mappability between two flattened k-mer tracks.
+
+    A single np.subtract over the full genome amortizes ufunc dispatch that
+    a chromosome-by-chromosome loop pays per contig; the returned
+    per-chromosome arrays are views into one contiguous buffer.
 
     Args:
-        data1 (Dict[str, np.ndarray]): Mappability data for the first k-mer size.
-        data2 (Dict[str, np.ndarray]): Mappability data for the second k-mer size.
+        flat1 (np.ndarray): Flattened mappability for the first k-mer size.
+        flat2 (np.ndarray): Flattened mappability for the second k-mer size.
+        index (Dict[str, Tuple[int, int]]): Chromosome offsets from
+            flatten_chromosomes, shared by both arrays.
+        out (Optional[np.ndarray]): Preallocated output buffer to reuse.
 
     Returns:
-        Dict[str, np.ndarray]: A dictionary of differences in mappability scores.
+        Dict[str, np.ndarray]: Per-chromosome views of the difference
+        (flat2 - flat1) in mappability scores. For quantized uint8 tracks
+        the difference is computed in int16 to hold the signed range.
+    """
+    diff_dtype = np.int16 if flat1.dtype == np.uint8 else flat1.dtype
+    if out is None:
+        out = np.empty(len(flat1), dtype=diff_dtype)
+    np.subtract(flat2, flat1, out=out, dtype=diff_dtype)
+    return {chrom: out[start:end] for chrom, (start, end) in index.items()}
+
+
+def diff_histogram(
+    flat1: np.ndarray, flat2: np.ndarray, edges: np.ndarray
+) -> np.ndarray:
     """
-    diff = {}
-    for chrom in data1.keys():
-        diff[chrom] = np.subtract(data2[chrom], data1[chrom])
-    return diff
+    Histogram of (flat2 - flat1) without materializing the full diff.
+
+    Streams the subtract in CHUNK_SIZE blocks through one reused buffer
+    and bins each block immediately, so bytes written drop from a
+    genome-length diff array to HIST_BINS counts.
+
+    Args:
+        flat1 (np.ndarray): Flattened mappability for the first k-mer size.
+        flat2 (np.ndarray): Flattened mappability for the second k-mer size.
+        edges (np.ndarray): Bin edges for the difference histogram.
+
+    Returns:
+        np.ndarray: int64 counts per bin of the pairwise difference.
+    """
+    diff_dtype = np.int16 if flat1.dtype == np.uint8 else flat1.dtype
+    hist = np.zeros(len(edges) - 1, dtype=np.int64)
+    buf = np.empty(min(CHUNK_SIZE, len(flat1)), dtype=diff_dtype)
+    for offset in range(0, len(flat1), CHUNK_SIZE):
+        stop = min(offset + CHUNK_SIZE, len(flat1))
+        block = buf[:stop - offset]
+        np.subtract(flat2[offset:stop], flat1[offset:stop], out=block, dtype=diff_dtype)
+        hist += np.histogram(block, bins=edges)[0]
+    return hist
+
+
+def pairwise_diff_histograms(
+    flat: Dict[str, np.ndarray], kmer_sizes: List[str], edges: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Difference histograms for every pair of k-mer sizes in one pass.
+
+    Stacks a PAIR_BLOCK slice of all samples into one (K, block) array and
+    computes every pairwise diff with a single broadcast subtract per
+    block, so each sample's data is read once per block instead of once
+    per pair as in the two-track diff_histogram.
+
+    Args:
+        flat (Dict[str, np.ndarray]): Flattened mappability per k-mer size,
+            all with identical chromosome layout.
+        kmer_sizes (List[str]): Sorted k-mer sizes to pair up.
+        edges (np.ndarray): Bin edges for the difference histograms.
+
+    Returns:
+        Dict[str, np.ndarray]: int64 bin counts keyed "k1_vs_k2" for every
+        combination with k1 < k2.
+    """
+    pairs = list(itertools.combinations(kmer_sizes, 2))
+    first = flat[kmer_sizes[0]]
+    diff_dtype = np.int16 if first.dtype == np.uint8 else first.dtype
+    i_idx, j_idx = np.triu_indices(len(kmer_sizes), 1)
+    hists = np.zeros((len(pairs), len(edges) - 1), dtype=np.int64)
+    for offset in range(0, len(first), PAIR_BLOCK):
+        stop = min(offset + PAIR_BLOCK, len(first))
+        stack = np.stack([flat[k][offset:stop] for k in kmer_sizes]).astype(
+            diff_dtype, copy=False
+        )
+        diffs = stack[j_idx] - stack[i_idx]
+        for p in range(len(pairs)):
+            hists[p] += np.histogram(diffs[p], bins=edges)[0]
+    return {f"{k1}_vs_{k2}": hists[p] for p, (k1, k2) in enumerate(pairs)}
+
+
+def _populate_cache(file_path: str, cache_dir: str, quantize: bool = False) -> None:
+    """
+    Worker that fills the .npy cache for one BigWig file.
+
+    Args:
+        file_path (str): Path to the BigWig file.
+        cache_dir (str): Directory for the .npy chromosome cache.
+        quantize (bool): Quantize scores to uint8 (see load_bigwig).
+    """
+    load_bigwig(file_path, cache_dir, quantize)
+
+
+def load_bigwigs(
+    bigwig_files: List[str],
+    cache_dir: Optional[str] = None,
+    processes: Optional[int] = None,
+    quantize: bool = False,
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Load BigWig files keyed by k-mer size, optionally in parallel.
+
+    Each file is independent I/O plus decompression, so loading is mapped
+    over a process pool. With a cache_dir the workers only populate the
+    .npy cache and the parent re-opens memory-mapped views, keeping the
+    transferred data to file paths; without one, arrays are pickled back
+    from the workers.
+
+    Args:
+        bigwig_files (List[str]): List of paths to BigWig files.
+        cache_dir (Optional[str]): Directory for the .npy chromosome cache.
+        processes (Optional[int]): Worker processes to use; defaults to one
+            per file (capped at the CPU count). Pass 1 to load serially.
+        quantize (bool): Quantize scores to uint8 (see load_bigwig).
+
+    Returns:
+        Dict[str, Dict[str, np.ndarray]]: Mappability data per k-mer size.
+    """
+    if processes is None:
+        processes = min(len(bigwig_files), os.cpu_count() or 1)
+
+    if processes > 1 and len(bigwig_files) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            if cache_dir:
+                list(pool.map(
+                    functools.partial(_populate_cache, cache_dir=cache_dir, quantize=quantize),
+                    bigwig_files,
+                ))
+                loaded = [load_bigwig(f, cache_dir, quantize) for f in bigwig_files]
+            else:
+                loaded = list(pool.map(
+                    functools.partial(load_bigwig, quantize=quantize), bigwig_files
+                ))
+    else:
+        loaded = [load_bigwig(f, cache_dir, quantize) for f in bigwig_files]
+
+    return {os.path.basename(f).split("_")[0]: d for f, d in zip(bigwig_files, loaded)}
 
 
 def analyze_mappability_changes(
     bigwig_files: List[str],
-) -> Tuple[Dict[str, Dict[str, np.ndarray]], Dict[str, Dict[str, np.ndarray]]]:
+    cache_dir: Optional[str] = None,
+    processes: Optional[int] = None,
+    quantize: bool = False,
+) -> Tuple[Dict[str, np.ndarray], Dict[str, Dict[str, np.ndarray]]]:
     """
     Analyze mappability changes across different k-mer sizes.
 
     Args:
         bigwig_files (List[str]): List of paths to BigWig files.
+        cache_dir (Optional[str]): Directory for the .npy chromosome cache
+            (see load_bigwig). If None, no cache is used.
+        processes (Optional[int]): Worker processes for loading BigWig
+            files (see load_bigwigs).
+        quantize (bool): Quantize scores to uint8 (see load_bigwig).
 
     Returns:
-        Tuple[Dict[str, Dict[str, np.ndarray]], Dict[str, Dict[str, np.ndarray]]]:
-        A tuple containing results of mappability comparisons and the original data.
+        Tuple[Dict[str, np.ndarray], Dict[str, Dict[str, np.ndarray]]]:
+        A tuple containing per-pair difference histograms (HIST_BINS counts
+        over [-1, 1] in score units) and the original data. Full diff
+        arrays are never materialized; compare_mappability remains
+        available for callers that need them.
     """
-    data = {os.path.basename(f).split("_")[0]: load_bigwig(f) for f in bigwig_files}
+    data = load_bigwigs(bigwig_files, cache_dir, processes, quantize)
 
-    results = {}
     kmer_sizes = sorted(data.keys())
+    chroms = list(data[kmer_sizes[0]].keys())
+    flat = {}
+    for kmer in kmer_sizes:
+        flat[kmer], _ = flatten_chromosomes(data[kmer], chroms)
 
-    for i in range(len(kmer_sizes) - 1):
-        for j in range(i + 1, len(kmer_sizes)):
-            k1, k2 = kmer_sizes[i], kmer_sizes[j]
-            diff = compare_mappability(data[k1], data[k2])
-            results[f"{k1}_vs_{k2}"] = diff
+    scale = QUANTIZE_SCALE if flat[kmer_sizes[0]].dtype == np.uint8 else 1
+    # float32 edges keep the genome-scale binning from upcasting to float64
+    edges = (np.linspace(-1.0, 1.0, HIST_BINS + 1) * scale).astype(np.float32)
+    results = pairwise_diff_histograms(flat, kmer_sizes, edges)
 
     return results, data
 
@@ -97,42 +429,126 @@ def load_gtf(gtf_file: str):
     """
     return gffpd.read_gff3(gtf_file)
 
-def calculate_gene_mappability(data: Dict[str, np.ndarray], gtf_data) -> pd.DataFrame:
+def _exon_table(data: Dict[str, np.ndarray], gtf_data) -> pd.DataFrame:
     """
-    Calculate mappability for each gene based on exon regions.
+    Extract exons with parsed gene_ids, restricted to known chromosomes.
 
     Args:
         data (Dict[str, np.ndarray]): Mappability data for a specific k-mer size.
         gtf_data (gffpandas.GffPandas): GTF data loaded with gffpandas.
 
     Returns:
-        pd.DataFrame: A dataframe with gene mappability information.
+        pd.DataFrame: Exon rows with a gene_id column, 1-based start/end.
     """
-    exons = gtf_data.filter_feature_of_type(['exon'])
-    gene_mappability = []
+    exons_df = gtf_data.filter_feature_of_type(['exon']).df.copy()
+    attributes = exons_df['attributes']
+    try:
+        # Arrow-backed strings run the regex in C; object dtype works, just slower.
+        attributes = attributes.astype(pd.StringDtype('pyarrow'))
+    except ImportError:
+        pass
+    exons_df['gene_id'] = attributes.str.extract(
+        r'gene_id "?([^";]+)"?', expand=False
+    ).astype(object)
+    exons_df = exons_df.dropna(subset=['gene_id'])
+    return exons_df[exons_df['seq_id'].isin(data.keys())]
+
+
+def prefix_mappable_counts(data: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Compute per-chromosome prefix sums of (score > MAPPABLE_THRESHOLD).
 
-    for _, exon in exons.df.iterrows():
-        chrom = exon['seq_id']
-        start = exon['start'] - 1  # Convert to 0-based
-        end = exon['end']
-        if 'gene_id' not in exon['attributes']:
-            continue
+    With cum[i] = number of mappable bases in arr[:i+1], the mappable-base
+    count of any interval is cum[end-1] - cum[start-1], so every exon (or
+    any future feature) query costs two loads instead of a slice scan.
 
-        gene_id = next(i.split(' ')[1] for i in exon['attributes'].split(';') if 'gene_id' in i)
+    Args:
+        data (Dict[str, np.ndarray]): Mappability data for a specific k-mer size.
 
-        if chrom in data:
-            exon_map = data[chrom][start:end]
-            total_bases = len(exon_map)
-            mappable_bases = np.sum(np.array(exon_map) > 0.9)
+    Returns:
+        Dict[str, np.ndarray]: int64 prefix-sum arrays keyed by chromosome.
+    """
+    return {
+        chrom: np.cumsum(np.asarray(arr) > mappable_threshold(arr.dtype), dtype=np.int64)
+        for chrom, arr in data.items()
+    }
+
+
+def calculate_gene_mappability(
+    data: Dict[str, np.ndarray],
+    gtf_data,
+    prefix_sums: Optional[Dict[str, np.ndarray]] = None,
+) -> pd.DataFrame:
+    """
+    Calculate mappability for each gene based on exon regions.
 
-            gene_mappability.append({
-                'gene_id': gene_id,
-                'total_exon_bases': total_bases,
-                'mappable_bases': mappable_bases,
-            })
+    gene_ids are parsed with one vectorized regex over the attributes
+    column and exons are counted per chromosome with no Python-level
+    per-row work: precomputed prefix sums make each exon a two-element
+    gather, the optional compiled (Cython) or numba kernels fuse compare
+    and sum per exon, and the numpy fallback reduces all exons in one
+    np.add.reduceat pass.
 
-    df = pd.DataFrame(gene_mappability)
-    df = df.groupby(['gene_id']).sum().reset_index()
+    Args:
+        data (Dict[str, np.ndarray]): Mappability data for a specific k-mer size.
+        gtf_data (gffpandas.GffPandas): GTF data loaded with gffpandas.
+        prefix_sums (Optional[Dict[str, np.ndarray]]): Precomputed prefix
+            sums from prefix_mappable_counts; computed per chromosome here
+            when not given.
+
+    Returns:
+        pd.DataFrame: A dataframe with gene mappability information.
+    """
+    exons_df = _exon_table(data, gtf_data)
+
+    total = np.zeros(len(exons_df), dtype=np.int64)
+    mappable = np.zeros(len(exons_df), dtype=np.int64)
+    positions = pd.Series(np.arange(len(exons_df)), index=exons_df.index)
+
+    for chrom, group in exons_df.groupby('seq_id', sort=False):
+        size = len(data[chrom])
+        starts = np.clip(group['start'].to_numpy(np.int64) - 1, 0, size)
+        ends = np.clip(group['end'].to_numpy(np.int64), 0, size)
+        pos = positions[group.index].to_numpy()
+        total[pos] = ends - starts
+        if prefix_sums is not None:
+            cum = prefix_sums[chrom]
+            mappable[pos] = cum[ends - 1] - np.where(starts > 0, cum[starts - 1], 0)
+        elif count_above_ranges is not None:
+            arr = np.ascontiguousarray(data[chrom])
+            mappable[pos] = count_above_ranges(
+                arr, starts, ends, mappable_threshold(arr.dtype)
+            )
+        elif njit is not None:
+            arr = np.ascontiguousarray(data[chrom])
+            counts = np.empty(len(starts), dtype=np.int64)
+            _count_mappable(arr, starts, ends, mappable_threshold(arr.dtype), counts)
+            mappable[pos] = counts
+        else:
+            arr = np.asarray(data[chrom])
+            # One zero-padded threshold mask plus a single reduceat over
+            # interleaved [start, end) bounds counts every exon in one
+            # C-level pass; the pad keeps end == size a valid index and the
+            # odd (end, next start) segments are discarded.
+            mask = np.empty(size + 1, dtype=np.uint8)
+            np.greater(arr, mappable_threshold(arr.dtype), out=mask[:size].view(np.bool_))
+            mask[size] = 0
+            indices = np.empty(2 * len(starts), dtype=np.int64)
+            indices[0::2] = starts
+            indices[1::2] = ends
+            mappable[pos] = np.add.reduceat(mask, indices, dtype=np.int64)[0::2]
+
+    # Categorical codes turn the per-gene aggregation into integer bincounts
+    # instead of hashing long gene_id strings per row; the sorted categories
+    # reproduce the ordering of the old groupby-sum.
+    gene_ids = exons_df['gene_id'].astype('category')
+    codes = gene_ids.cat.codes.to_numpy()
+    n_genes = len(gene_ids.cat.categories)
+    df = pd.DataFrame({
+        'gene_id': gene_ids.cat.categories,
+        'total_exon_bases': np.bincount(codes, weights=total, minlength=n_genes).astype(np.int64),
+        'mappable_bases': np.bincount(codes, weights=mappable, minlength=n_genes).astype(np.int64),
+    })
     df['mappability_ratio'] = df['mappable_bases'] / df['total_exon_bases']
     return df
 
@@ -149,7 +565,10 @@ def analyze_gene_mappability_changes(data: Dict[str, Dict[str, np.ndarray]], gtf
     """
     gene_mappability = {}
     for kmer, mappability_data in data.items():
-        gene_mappability[kmer] = calculate_gene_mappability(mappability_data, gtf_data)
+        prefix_sums = prefix_mappable_counts(mappability_data)
+        gene_mappability[kmer] = calculate_gene_mappability(
+            mappability_data, gtf_data, prefix_sums
+        )
     return gene_mappability
 
 
@@ -182,9 +601,16 @@ def get_gene_specific_mappability(data: Dict[str, np.ndarray], gtf_data) -> pd.D
 
 def main(args: argparse.Namespace) -> None:
     os.makedirs(args.output_dir, exist_ok=True)
+    if args.cache_dir:
+        os.makedirs(args.cache_dir, exist_ok=True)
     bigwig_files = [os.path.join(args.bigwig_dir, f) for f in os.listdir(args.bigwig_dir) if f.endswith('.bw')]
-    
-    results, data = analyze_mappability_changes(bigwig_files)
+
+    results, data = analyze_mappability_changes(
+        bigwig_files,
+        cache_dir=args.cache_dir,
+        processes=args.processes,
+        quantize=args.quantize,
+    )
     
     plot_mappability_distribution(data, args.output_dir)
     plot_mappability_changes(results, args.output_dir)
@@ -206,6 +632,9 @@ if __name__ == "__main__":
     parser.add_argument("bigwig_dir", help="Directory containing BigWig files of mappability tracks")
     parser.add_argument("output_dir", help="Directory to save output files")
     parser.add_argument("--gtf_file", help="Path to GTF file for gene-level analysis")
+    parser.add_argument("--cache_dir", help="Directory to cache loaded chromosomes as .npy for faster reruns")
+    parser.add_argument("-p", "--processes", type=int, help="Worker processes for loading BigWig files (default: one per file)")
+    parser.add_argument("--quantize", action="store_true", help="Store mappability scores as uint8 (value*255) to quarter memory use")
     parser.add_argument("-v", "--verbose", action="store_true", help="Increase output verbosity")
     args = parser.parse_args()
 
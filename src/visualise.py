@@ -1,12 +1,58 @@
 
 from typing import Dict
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # headless plotting; skips interactive backend setup
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 import pandas as pd
 
 
+HIST_BINS = 512  # fixed bin count for streamed score/diff histograms
+
+
+def _accumulate_histogram(
+    chrom_data: Dict[str, np.ndarray], edges: np.ndarray
+) -> np.ndarray:
+    """
+    Sum per-chromosome histograms over fixed bin edges.
+
+    Avoids concatenating the chromosomes into one genome-length array just
+    to feed a plot that bins the values anyway; peak memory stays at one
+    histogram of HIST_BINS counts.
+
+    Args:
+        chrom_data (Dict[str, np.ndarray]): Per-chromosome value arrays.
+        edges (np.ndarray): Shared bin edges for all chromosomes.
+
+    Returns:
+        np.ndarray: int64 counts per bin, summed over chromosomes.
+    """
+    hist = np.zeros(len(edges) - 1, dtype=np.int64)
+    for arr in chrom_data.values():
+        hist += np.histogram(arr, bins=edges)[0]
+    return hist
+
+
+def _value_scale(chrom_data: Dict[str, np.ndarray]) -> float:
+    """
+    Return the units-per-score factor of a per-chromosome dict.
+
+    Quantized tracks store score*255 in integer arrays; scaling histogram
+    edges by this factor keeps plot axes in [0, 1] score units regardless
+    of storage dtype.
+
+    Args:
+        chrom_data (Dict[str, np.ndarray]): Per-chromosome value arrays.
+
+    Returns:
+        float: 255.0 for integer (quantized) arrays, 1.0 for float arrays.
+    """
+    first = next(iter(chrom_data.values()))
+    return 255.0 if np.issubdtype(first.dtype, np.integer) else 1.0
+
+
 def plot_mappability_distribution(
     data: Dict[str, Dict[str, np.ndarray]], output_dir: str
 ) -> None:
@@ -18,9 +64,12 @@ def plot_mappability_distribution(
         output_dir (str): Directory to save the output plot.
     """
     fig, ax = plt.subplots(figsize=(10, 6))
+    # float32 edges match the track dtype so binning never upcasts to float64
+    edges = np.linspace(0.0, 1.0, HIST_BINS + 1, dtype=np.float32)
+    centers = (edges[:-1] + edges[1:]) / 2
     for kmer, chrom_data in data.items():
-        all_values = np.concatenate(list(chrom_data.values()))
-        sns.kdeplot(all_values, label=f"{kmer}-mers", ax=ax)
+        hist = _accumulate_histogram(chrom_data, edges * _value_scale(chrom_data))
+        sns.kdeplot(x=centers, weights=hist, label=f"{kmer}-mers", ax=ax)
 
     ax.set_xlabel("Mappability Score")
     ax.set_ylabel("Density")
@@ -31,28 +80,35 @@ def plot_mappability_distribution(
 
 
 def plot_mappability_changes(
-    results: Dict[str, Dict[str, np.ndarray]], output_dir: str
+    results: Dict[str, np.ndarray], output_dir: str
 ) -> None:
     """
     Plot the changes in mappability scores between different k-mer sizes.
 
     Args:
-        results (Dict[str, Dict[str, np.ndarray]]): Results of mappability comparisons.
+        results (Dict[str, np.ndarray]): Per-pair difference histograms of
+            HIST_BINS counts over [-1, 1] in score units.
         output_dir (str): Directory to save the output plots.
     """
-    for comparison, diff_data in results.items():
-        fig, ax = plt.subplots(figsize=(10, 6))
-        all_diffs = np.concatenate(list(diff_data.values()))
-        sns.histplot(all_diffs, kde=True, ax=ax)
+    edges = np.linspace(-1.0, 1.0, HIST_BINS + 1)
+    centers = (edges[:-1] + edges[1:]) / 2
+    # One Figure reused across comparisons; construction costs tens of ms each
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for comparison, hist in results.items():
+        ax.clear()
+        # bins must not be an ndarray: seaborn compares it against "auto"
+        # elementwise and crashes, so pass the count plus range instead
+        sns.histplot(x=centers, weights=hist, bins=HIST_BINS,
+                     binrange=(-1.0, 1.0), kde=True, ax=ax)
 
         ax.set_xlabel("Mappability Score Difference")
         ax.set_ylabel("Count")
         ax.set_title(f"Mappability Changes: {comparison}")
-        plt.savefig(
+        fig.savefig(
             os.path.join(output_dir,
                          f"mappability_changes_{comparison}.png")
                          )
-        plt.close()
+    plt.close(fig)
 
 def plot_gene_mappability_changes(gene_mappability: Dict[str, pd.DataFrame], output_dir: str) -> None:
     """
@@ -63,13 +119,14 @@ def plot_gene_mappability_changes(gene_mappability: Dict[str, pd.DataFrame], out
         output_dir (str): Directory to save the output plots.
     """
     kmer_sizes = sorted(gene_mappability.keys())
-    merged_data = gene_mappability[kmer_sizes[0]].copy()
-    merged_data.set_index('gene_id', inplace=True)
-    for kmer in kmer_sizes[1:]:
-        merged_data[f'mappability_ratio_{kmer}'] = gene_mappability[kmer].set_index('gene_id')['mappability_ratio']
-    
-    # rename kmer[0] to mappability_ratio_kmer[0]
-    merged_data.rename(columns={'mappability_ratio': 'mappability_ratio_{}'.format(kmer_sizes[0])}, inplace=True)
+    merged_data = pd.concat(
+        {
+            kmer: gene_mappability[kmer].set_index('gene_id')['mappability_ratio']
+            for kmer in kmer_sizes
+        },
+        axis=1,
+    )
+    merged_data.columns = [f'mappability_ratio_{kmer}' for kmer in kmer_sizes]
     fig, ax = plt.subplots(figsize=(10, 6))
     sns.boxplot(data=merged_data[[f'mappability_ratio_{kmer}' for kmer in kmer_sizes]], ax=ax)
     ax.set_xticklabels(kmer_sizes)
@@ -80,9 +137,12 @@ def plot_gene_mappability_changes(gene_mappability: Dict[str, pd.DataFrame], out
     plt.close()
 
     # Plot heatmap of top 100 genes with highest variance in mappability
-    variance = merged_data[[f'mappability_ratio_{kmer}' for kmer in kmer_sizes]].var(axis=1)
-    top_100_genes = variance.nlargest(100).index
-    top_100_data = merged_data.loc[top_100_genes, [f'mappability_ratio_{kmer}' for kmer in kmer_sizes]]
+    variance = merged_data[[f'mappability_ratio_{kmer}' for kmer in kmer_sizes]].var(axis=1).to_numpy()
+    top_k = min(100, len(variance))
+    # argpartition selects the top k in O(N); only those rows need sorting for display
+    top_idx = np.argpartition(-variance, top_k - 1)[:top_k]
+    top_idx = top_idx[np.argsort(-variance[top_idx])]
+    top_100_data = merged_data.iloc[top_idx][[f'mappability_ratio_{kmer}' for kmer in kmer_sizes]]
     
     fig, ax = plt.subplots(figsize=(12, 20))
     sns.heatmap(top_100_data, cmap='YlOrRd', ax=ax)